@@ -1,6 +1,43 @@
-from typing import IO, Iterator, Tuple, Union
+import re
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
 
-def parse_fasta(source: Union[str, IO[str]]) -> Iterator[Tuple[str, str]]:
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional; it is only needed by parse_fasta_batches.
+    np = None
+
+try:
+    from fasta_c import scan_chunks as _scan_chunks_c, scan_headers as _scan_headers_c
+except ImportError:
+    # The C extension is optional; see setup.py.
+    _scan_chunks_c = _scan_headers_c = None
+
+# Size of the blocks read from the underlying binary stream. Large reads
+# keep the syscall count low on multi-gigabyte files and pipes.
+DEFAULT_BUFFER_SIZE = 256 * 1024
+
+# Bytes removed from sequence data in a single C-level translate() pass.
+# This is the ASCII whitespace set bytes.strip() trims from headers, so every
+# scanner (including fasta_c) treats the same bytes as whitespace.
+_SEQUENCE_WHITESPACE = b' \t\n\r\x0b\x0c'
+# The same bytes one at a time, line break first, so a block can be checked
+# for whitespace with a few memchr() calls before paying for translate().
+_WHITESPACE_BYTES = tuple(bytes([code]) for code in b'\n' + _SEQUENCE_WHITESPACE.replace(b'\n', b''))
+
+# Whitespace that may indent a header line: a line is a header when its first
+# non-whitespace character is '>', as in the original line-by-line parser.
+_INDENT = b' \t\r\x0b\x0c'
+_INDENT_CODES = frozenset(_INDENT)
+_INDENTED_HEADER = re.compile(rb'\n[ \t\r\x0b\x0c]+>')
+# A header line after a newline, capturing its text without the surrounding
+# whitespace (\s is the same ASCII set in bytes patterns).
+_HEADER_LINE = re.compile(rb'\n[ \t\r\x0b\x0c]*>[ \t\r\x0b\x0c]*([^\n]*\S)?')
+
+def parse_fasta(
+    source: Union[str, IO[str]],
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> Iterator[Tuple[str, str]]:
     """
     Parses a FASTA file and yields header-sequence pairs.
 
@@ -8,9 +45,18 @@ def parse_fasta(source: Union[str, IO[str]]) -> Iterator[Tuple[str, str]]:
     iterates through the records. It handles multi-line sequences by
     joining them into a single string.
 
+    Every sequence is assembled in memory even if the caller discards it.
+    Callers that only need the record identifiers (counting, deduplication,
+    indexing) should use `parse_fasta_headers` instead, which passes over
+    sequence bytes without copying them.
+    Callers that process sequences as bytes should use `parse_fasta_views`,
+    which skips the decode to str.
+
     Args:
         source: A file path (str) or a file-like object (e.g., open file handle)
                 containing FASTA formatted data.
+        buffer_size: Number of bytes requested per read. Worth raising when
+                reading from a pipe such as `zcat` output.
 
     Yields:
         A tuple containing the header (string, without the leading '>') and
@@ -21,29 +67,417 @@ def parse_fasta(source: Union[str, IO[str]]) -> Iterator[Tuple[str, str]]:
         IOError: If there's an issue reading the file.
     """
     if isinstance(source, str):
-        with open(source, 'r') as f:
-            yield from _parse_fasta_stream(f)
+        with open(source, 'rb', buffering=buffer_size) as f:
+            yield from _parse_fasta_stream(f, buffer_size)
     else:
-        yield from _parse_fasta_stream(source)
+        yield from _parse_fasta_stream(source, buffer_size)
 
-def _parse_fasta_stream(stream: IO[str]) -> Iterator[Tuple[str, str]]:
-    """Helper function to parse a file stream."""
-    header = None
-    sequence_parts = []
+def parse_fasta_headers(
+    source: Union[str, IO[str]],
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> Iterator[str]:
+    """
+    Parses a FASTA file and yields only the record headers.
+
+    The stream is read in blocks and only the header lines are sliced out of
+    them; sequence bytes are never copied or decoded. The headers are
+    identical to those produced by `parse_fasta`.
 
-    for line in stream:
-        line = line.strip()
-        if not line:
+    Args:
+        source: A file path (str) or a file-like object (e.g., open file handle)
+                containing FASTA formatted data.
+        buffer_size: Number of bytes requested per read.
+
+    Yields:
+        The header of each record (string, without the leading '>').
+
+    Raises:
+        FileNotFoundError: If the source is a path and the file does not exist.
+        IOError: If there's an issue reading the file.
+    """
+    if isinstance(source, str):
+        with open(source, 'rb', buffering=buffer_size) as f:
+            yield from _parse_fasta_headers_stream(f, buffer_size)
+    else:
+        yield from _parse_fasta_headers_stream(source, buffer_size)
+
+def _parse_fasta_headers_stream(stream: IO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> Iterator[str]:
+    """Helper function to extract headers from a file stream."""
+    scan = _scan_headers_c if _scan_headers_c is not None else _scan_headers
+    for headers in scan(_read_chunks(stream, buffer_size)):
+        # One decode per block rather than one per header.
+        yield from b'\n'.join(headers).decode('utf-8').split('\n')
+
+def _scan_headers(chunks: Iterable[bytes]) -> Iterator[List[bytes]]:
+    """
+    Finds the trimmed header lines in a sequence of byte blocks.
+
+    Pure-Python counterpart of `fasta_c.scan_headers`: yields a non-empty
+    list per block with the headers that end in it.
+
+    Blocks are never split into lines: a block without a '>' costs a single
+    memchr(), and the header lines of any other block are extracted by one
+    ``findall()`` over its complete lines, so sequence bytes are never copied.
+    Only the lines that run across block boundaries are examined in Python.
+    """
+    # Text after the '>' of a header line that has not ended yet.
+    head: Optional[bytes] = None
+    # True inside a line that is known not to be a header.
+    in_sequence = False
+
+    for chunk in chunks:
+        size = len(chunk)
+        first = chunk.find(b'\n')
+        end = size if first < 0 else first
+        # The line the previous block ended in, or that opens this block.
+        if head is not None:
+            head += chunk[:end]
+        elif not in_sequence:
+            start = _skip_indent(chunk, 0, end)
+            if start < end:
+                if chunk[start] == 62:  # '>'
+                    head = chunk[start + 1:end]
+                else:
+                    in_sequence = True
+        if first < 0:
             continue
+        headers = []
+        if head is not None:
+            headers.append(head.strip())
+            head = None
+        in_sequence = False
+
+        last = chunk.rfind(b'\n')
+        if last > first and chunk.find(b'>', first, last) >= 0:
+            headers += _HEADER_LINE.findall(chunk, first, last)
+        if headers:
+            yield headers
+
+        # The line after the last newline runs into the next block.
+        start = _skip_indent(chunk, last + 1, size)
+        if start < size:
+            if chunk[start] == 62:
+                head = chunk[start + 1:]
+            else:
+                in_sequence = True
+
+    if head is not None:
+        # The file ended on a header line.
+        yield [head.strip()]
+
+def _skip_indent(chunk: bytes, start: int, end: int) -> int:
+    """Returns the position of the first byte in ``chunk[start:end]`` that is not indentation."""
+    while start < end and chunk[start] in _INDENT_CODES:
+        start += 1
+    return start
+
+class FastaView:
+    """
+    A FASTA record whose sequence is kept as bytes instead of a str.
+
+    `sequence` is a read-only memoryview over the bytes object the record
+    owns, so slicing it does not copy. Use ``bytes(view.sequence)`` when a
+    bytes object is needed.
+    """
+    __slots__ = ('header', '_sequence')
+
+    def __init__(self, header: str, sequence: bytes):
+        self.header = header
+        self._sequence = sequence
+
+    @property
+    def sequence(self) -> memoryview:
+        """The sequence bytes, with all whitespace removed."""
+        return memoryview(self._sequence)
+
+    def __len__(self) -> int:
+        return len(self._sequence)
+
+    def __repr__(self) -> str:
+        return f"FastaView(header={self.header!r}, length={len(self)})"
 
-        if line.startswith('>'):
-            if header is not None:
-                yield header, "".join(sequence_parts)
-            header = line[1:].strip()
-            sequence_parts = []
-        elif header is not None:
-            sequence_parts.append(line)
+def parse_fasta_views(
+    source: Union[str, IO[str]],
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> Iterator[FastaView]:
+    """
+    Parses a FASTA file and yields `FastaView` records.
+
+    This is the fast path for consumers that work on bytes (k-mer counting,
+    hashing): it skips decoding every sequence to a str, which `parse_fasta`
+    does for each record. The scanners still copy each sequence out of the
+    blocks read into a bytes object of its own, as `parse_fasta` does.
+
+    Args:
+        source: A file path (str) or a file-like object (e.g., open file handle)
+                containing FASTA formatted data.
+        buffer_size: See `parse_fasta`.
+
+    Yields:
+        A `FastaView` per record, in file order.
+
+    Raises:
+        FileNotFoundError: If the source is a path and the file does not exist.
+        IOError: If there's an issue reading the file.
+    """
+    if isinstance(source, str):
+        with open(source, 'rb', buffering=buffer_size) as f:
+            yield from _parse_fasta_views_stream(f, buffer_size)
+    else:
+        yield from _parse_fasta_views_stream(source, buffer_size)
+
+def parse_fasta_batches(
+    source: Union[str, IO[str]],
+    batch_size: int = 1024,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> Iterator[Tuple[List[str], 'np.ndarray', bytearray]]:
+    """
+    Parses a FASTA file and yields records in structure-of-arrays batches.
+
+    Each batch packs the sequences of up to `batch_size` records back to back
+    in one buffer, so consumers can hand the whole batch to NumPy, a hash
+    table or a GPU kernel instead of paying Python overhead per record::
+
+        for headers, offsets, buffer in parse_fasta_batches(path):
+            sequences = np.frombuffer(buffer, dtype=np.uint8)
+            first = buffer[offsets[0]:offsets[1]]
+
+    A batch costs its sequence bytes plus 8 bytes per record for the offsets.
+    Batches are never reused, so callers may keep them.
+
+    Args:
+        source: A file path (str) or a file-like object (e.g., open file handle)
+                containing FASTA formatted data.
+        batch_size: Maximum number of records per batch; the last batch may
+                be smaller.
+        buffer_size: See `parse_fasta`.
+
+    Yields:
+        A tuple of the batch's headers (list of str), an int64 array of
+        ``len(headers) + 1`` offsets where record ``i`` spans
+        ``buffer[offsets[i]:offsets[i + 1]]``, and the sequence buffer.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+        ValueError: If `batch_size` is not positive.
+        FileNotFoundError: If the source is a path and the file does not exist.
+        IOError: If there's an issue reading the file.
+    """
+    if np is None:
+        raise ImportError("parse_fasta_batches requires NumPy")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+
+    if isinstance(source, str):
+        with open(source, 'rb', buffering=buffer_size) as f:
+            yield from _parse_fasta_batches_stream(f, batch_size, buffer_size)
+    else:
+        yield from _parse_fasta_batches_stream(source, batch_size, buffer_size)
+
+def _read_chunks(stream: IO, chunk_size: int = DEFAULT_BUFFER_SIZE) -> Iterator[bytes]:
+    """
+    Yields fixed-size byte blocks from a binary or text stream.
+
+    Text streams are read through their own text layer, so data the caller
+    has already buffered (e.g. after ``f.readline()``) is not skipped and the
+    stream's encoding is honoured. The decoded text is re-encoded as UTF-8,
+    which is what the scanners decode headers with.
+    """
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        yield chunk
+
+def _parse_fasta_stream(
+    stream: IO,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> Iterator[Tuple[str, str]]:
+    """Helper function to parse a file stream."""
+    for header, sequence in _scan_records(stream, buffer_size):
+        yield header.decode('utf-8'), str(sequence, 'ascii')
+
+def _parse_fasta_views_stream(
+    stream: IO,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> Iterator[FastaView]:
+    """Helper function to parse a file stream into views."""
+    for header, sequence in _scan_records(stream, buffer_size):
+        yield FastaView(header.decode('utf-8'), sequence)
+
+def _parse_fasta_batches_stream(
+    stream: IO,
+    batch_size: int,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> Iterator[Tuple[List[str], 'np.ndarray', bytearray]]:
+    """Helper function to parse a file stream into batches."""
+    headers: List[str] = []
+    offsets = np.zeros(batch_size + 1, dtype=np.int64)
+    sequence_buf = bytearray()
+
+    for header, sequence in _scan_records(stream, buffer_size):
+        headers.append(header.decode('utf-8'))
+        sequence_buf += sequence
+        offsets[len(headers)] = len(sequence_buf)
+        if len(headers) == batch_size:
+            yield headers, offsets, sequence_buf
+            headers = []
+            offsets = np.zeros(batch_size + 1, dtype=np.int64)
+            sequence_buf = bytearray()
+
+    if headers:
+        yield headers, offsets[:len(headers) + 1], sequence_buf
+
+def _scan_records(stream: IO, buffer_size: int) -> Iterator[Tuple[bytes, bytes]]:
+    """
+    Returns the fastest available scanner over a stream.
+
+    Every scanner yields the trimmed header bytes and the whitespace-free
+    sequence bytes.
+    """
+    if _scan_chunks_c is not None:
+        return _scan_chunks_c(_read_chunks(stream, buffer_size))
+    return _scan_chunks(_read_chunks(stream, buffer_size))
+
+def _scan_chunks(chunks: Iterable[bytes]) -> Iterator[Tuple[bytes, bytes]]:
+    """
+    Splits a sequence of byte blocks into raw (header, sequence) records.
+
+    Pure-Python counterpart of `fasta_c.scan_chunks`: a line whose first
+    non-whitespace byte is '>' starts a record, headers are trimmed of ASCII
+    whitespace while still bytes, and sequences have all whitespace removed.
+
+    The records that start and end inside a block are split off together by
+    `_split_records`. Blocks without a '>' are not searched any further, and
+    the sequence of a record that spans blocks is collected as whitespace-free
+    pieces joined once when the record ends.
+
+    This pays off for wrapped sequences, which are read several times faster
+    than by the original line-by-line parser. Short one-line records are read
+    about as fast as before, and long one-line sequences slightly faster:
+    the bytes objects created per record cost as much as the lines did, so
+    only `fasta_c` makes short records faster.
+    """
+    spanning = _SpanningRecord()
+    in_record = False
+    # True when the previous block ended with a newline, possibly followed
+    # by indentation, so a '>' opening this block starts a header line. The
+    # start of the file counts too.
+    at_line_start = True
+
+    for chunk in chunks:
+        if at_line_start and chunk and chunk[0] in _INDENT_CODES:
+            # Indentation is whitespace either way, so it can be dropped
+            # when it leads up to a '>' or fills the whole block.
+            stripped = chunk.lstrip(_INDENT)
+            if not stripped or stripped[:1] == b'>':
+                chunk = stripped
+        if not chunk:
+            continue
+        if b'>' not in chunk:
+            # Most blocks of a long sequence hold no record boundary; a
+            # single memchr() is far cheaper than looking for one.
+            if in_record:
+                spanning.feed(chunk)
+        else:
+            # Offsets of the newlines before the first and the last header
+            # in the block; -1 when the block itself opens with a header.
+            opens = at_line_start and chunk[:1] == b'>'
+            first = -1 if opens else chunk.find(b'\n>')
+            last = max(first, chunk.rfind(b'\n>'))
+            if (first < 0 and not opens) or chunk.find(b'>') != first + 1 or chunk.find(b'>', last + 2) >= 0:
+                # Rare: an indented header line, or a '>' inside a line,
+                # outside the records `_split_records` checks for itself.
+                chunk = _INDENTED_HEADER.sub(b'\n>', chunk)
+                first = -1 if opens else chunk.find(b'\n>')
+                last = max(first, chunk.rfind(b'\n>'))
+            if first < 0 and not opens:
+                if in_record:
+                    spanning.feed(chunk)
+            else:
+                if in_record:
+                    if first > 0:
+                        spanning.feed(chunk[:first])
+                    yield spanning.finish()
+                if last > first:
+                    yield from _split_records(chunk[first + 1:last])
+                spanning.feed(chunk[last + 2:])
+                in_record = True
+        tail = chunk.rstrip(_INDENT)
+        if tail:
+            at_line_start = tail.endswith(b'\n')
 
     # Yield the last record in the file
-    if header is not None:
-        yield header, "".join(sequence_parts)
+    if in_record:
+        yield spanning.finish()
+
+def _split_records(block: bytes) -> Iterable[Tuple[bytes, bytes]]:
+    """
+    Splits complete records, the first starting with its '>', into (header, sequence) pairs.
+
+    Records written as one header line and one whitespace-free sequence line
+    are split with a handful of C-level calls on the whole block, so their
+    number adds no Python-level work; any other block, or one with a '>'
+    inside a sequence line, falls back to one ``partition()`` per record.
+    """
+    lines = block.split(b'\n')
+    sequences = lines[1::2]
+    if len(lines) == 2 * len(sequences):
+        # Every other line must be a header, and no line in between may hold
+        # whitespace (such as an indented header) or a '>'.
+        headers = b'\n'.join(lines[0::2]).split(b'\n>')
+        sequence_bytes = b''.join(sequences)
+        if (len(headers) == len(sequences) and b'>' not in sequence_bytes
+                and not any(code in sequence_bytes for code in _INDENT)):
+            headers[0] = headers[0][1:]
+            return zip(map(bytes.strip, headers), sequences)
+
+    pieces = block[1:].split(b'\n>')
+    if block.count(b'>') != len(pieces):
+        # Rare: an indented header line, or a '>' inside a line.
+        pieces = _INDENTED_HEADER.sub(b'\n>', block)[1:].split(b'\n>')
+    records = []
+    for piece in pieces:
+        header, _, sequence = piece.partition(b'\n')
+        records.append((header.strip(), sequence.translate(None, _SEQUENCE_WHITESPACE)))
+    return records
+
+class _SpanningRecord:
+    """The record `_scan_chunks` is reading when a block ends inside it."""
+    __slots__ = ('_header', '_head', '_pieces')
+
+    def __init__(self):
+        self._header: Optional[bytes] = None
+        # Start of a header line that has not ended yet.
+        self._head = b''
+        self._pieces: List[bytes] = []
+
+    def feed(self, piece: bytes):
+        """Appends the next piece of the record, starting just after its '>'."""
+        if self._header is None:
+            head = self._head + piece
+            header_end = head.find(b'\n')
+            if header_end < 0:
+                self._head = head
+                return
+            self._header = head[:header_end].strip()
+            self._head = b''
+            piece = head[header_end + 1:]
+        if any(space in piece for space in _WHITESPACE_BYTES):
+            piece = piece.translate(None, _SEQUENCE_WHITESPACE)
+        self._pieces.append(piece)
+
+    def finish(self) -> Tuple[bytes, bytes]:
+        """Returns the completed (header, sequence) and resets for the next record."""
+        if self._header is None:
+            # The file ended on a header line.
+            record = self._head.strip(), b''
+        else:
+            # A single piece is returned as is rather than copied.
+            record = self._header, b''.join(self._pieces)
+        self._header = None
+        self._head = b''
+        self._pieces = []
+        return record
@@ -0,0 +1,304 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+C implementation of the FASTA record scanner used by `fasta.py`.
+
+Newlines are located with libc ``memchr`` and each line is classified by
+its first non-whitespace byte. Sequence bytes are copied, minus whitespace,
+into a single growable C buffer, so the only Python objects created are the
+emitted ``(header, sequence)`` bytes pairs. A sequence line that runs past
+the end of a block is copied as it arrives rather than buffered whole.
+
+Build in place with ``python setup.py build_ext --inplace``; `fasta.py`
+picks the extension up automatically when it is importable.
+"""
+cimport cython
+from cpython.bytearray cimport PyByteArray_AS_STRING, PyByteArray_GET_SIZE
+from cpython.bytes cimport PyBytes_AS_STRING, PyBytes_FromStringAndSize, PyBytes_GET_SIZE
+from libc.stdlib cimport free, realloc
+from libc.string cimport memchr, memcpy
+
+
+cdef inline bint _is_space(char c) noexcept nogil:
+    # The ASCII whitespace bytes.strip() trims: ' ', '\t', '\n', '\v', '\f', '\r'.
+    return c == b' ' or (c >= b'\t' and c <= b'\r')
+
+
+cdef inline bint _has_space(const char *data, Py_ssize_t length) noexcept nogil:
+    # One vectorized memchr() per whitespace byte beats testing every byte.
+    return (memchr(data, b'\n', length) != NULL or memchr(data, b'\r', length) != NULL
+            or memchr(data, b' ', length) != NULL or memchr(data, b'\t', length) != NULL
+            or memchr(data, b'\x0b', length) != NULL or memchr(data, b'\x0c', length) != NULL)
+
+
+@cython.final
+cdef class _Scanner:
+    """Incremental scanner fed one block at a time."""
+
+    cdef char *sequence
+    cdef Py_ssize_t sequence_len
+    cdef Py_ssize_t sequence_cap
+    cdef object header
+    cdef bytearray partial
+    # True while the unfinished line at the end of the last block is a
+    # sequence line whose bytes have already been appended.
+    cdef bint sequence_line
+
+    def __cinit__(self):
+        self.sequence = NULL
+        self.sequence_len = 0
+        self.sequence_cap = 0
+        self.header = None
+        self.partial = bytearray()
+        self.sequence_line = False
+
+    def __dealloc__(self):
+        free(self.sequence)
+
+    cdef int _reserve(self, Py_ssize_t extra) except -1:
+        cdef Py_ssize_t needed = self.sequence_len + extra
+        cdef Py_ssize_t cap = self.sequence_cap
+        cdef char *grown
+        if needed <= cap:
+            return 0
+        if cap == 0:
+            cap = 4096
+        while cap < needed:
+            cap *= 2
+        grown = <char *> realloc(self.sequence, cap)
+        if grown == NULL:
+            raise MemoryError()
+        self.sequence = grown
+        self.sequence_cap = cap
+        return 0
+
+    cdef bytes _take_sequence(self):
+        cdef bytes sequence = PyBytes_FromStringAndSize(self.sequence, self.sequence_len)
+        self.sequence_len = 0
+        return sequence
+
+    cdef inline int _append_sequence(self, const char *data, Py_ssize_t length) except -1:
+        cdef char *out
+        cdef char c
+        cdef Py_ssize_t i
+        if self.header is None:
+            # Text before the first header is ignored.
+            return 0
+        self._reserve(length)
+        out = self.sequence + self.sequence_len
+        if not _has_space(data, length):
+            memcpy(out, data, length)
+            self.sequence_len += length
+            return 0
+        for i in range(length):
+            c = data[i]
+            if not _is_space(c):
+                out[0] = c
+                out += 1
+        self.sequence_len = out - self.sequence
+        return 0
+
+    cdef int _line(self, const char *line, Py_ssize_t length, list records) except -1:
+        cdef Py_ssize_t start = 0
+
+        # A header line may be indented; its first non-whitespace byte is '>'.
+        while start < length and _is_space(line[start]):
+            start += 1
+        if start < length and line[start] == b'>':
+            if self.header is not None:
+                records.append((self.header, self._take_sequence()))
+            start += 1
+            while start < length and _is_space(line[start]):
+                start += 1
+            while length > start and _is_space(line[length - 1]):
+                length -= 1
+            self.header = PyBytes_FromStringAndSize(line + start, length - start)
+        else:
+            self._append_sequence(line, length)
+        return 0
+
+    cdef int _hold(self, bytes chunk, Py_ssize_t pos) except -1:
+        """Keeps the unfinished line at the end of a block for the next one."""
+        cdef const char *buf = PyBytes_AS_STRING(chunk)
+        cdef Py_ssize_t n = PyBytes_GET_SIZE(chunk)
+        cdef const char *line
+        cdef Py_ssize_t length, start = 0
+
+        if self.sequence_line:
+            self._append_sequence(buf + pos, n - pos)
+            return 0
+        self.partial += chunk[pos:]
+        # Once the line is known not to be a header, its bytes go straight
+        # to the sequence, so long unwrapped sequences are not buffered twice.
+        line = PyByteArray_AS_STRING(self.partial)
+        length = PyByteArray_GET_SIZE(self.partial)
+        while start < length and _is_space(line[start]):
+            start += 1
+        if start < length and line[start] != b'>':
+            self._append_sequence(line, length)
+            self.partial = bytearray()
+            self.sequence_line = True
+        return 0
+
+    cdef list feed(self, bytes chunk):
+        cdef const char *buf = PyBytes_AS_STRING(chunk)
+        cdef Py_ssize_t n = PyBytes_GET_SIZE(chunk)
+        cdef Py_ssize_t pos = 0
+        cdef const char *nl
+        cdef bytes line
+        cdef list records = []
+
+        if self.sequence_line:
+            # Finish the sequence line left unfinished by the previous block.
+            nl = <const char *> memchr(buf, b'\n', n)
+            if nl == NULL:
+                self._append_sequence(buf, n)
+                return records
+            pos = nl - buf
+            self._append_sequence(buf, pos)
+            self.sequence_line = False
+            pos += 1
+        elif self.partial:
+            # Complete the line left unfinished by the previous block.
+            nl = <const char *> memchr(buf, b'\n', n)
+            if nl == NULL:
+                self._hold(chunk, 0)
+                return records
+            pos = nl - buf
+            self.partial += chunk[:pos]
+            line = bytes(self.partial)
+            self.partial = bytearray()
+            self._line(PyBytes_AS_STRING(line), PyBytes_GET_SIZE(line), records)
+            pos += 1
+
+        while pos < n:
+            nl = <const char *> memchr(buf + pos, b'\n', n - pos)
+            if nl == NULL:
+                self._hold(chunk, pos)
+                break
+            self._line(buf + pos, (nl - buf) - pos, records)
+            pos = (nl - buf) + 1
+        return records
+
+    cdef list finish(self):
+        cdef bytes line
+        cdef list records = []
+        if self.partial:
+            line = bytes(self.partial)
+            self.partial = bytearray()
+            self._line(PyBytes_AS_STRING(line), PyBytes_GET_SIZE(line), records)
+        self.sequence_line = False
+        if self.header is not None:
+            records.append((self.header, self._take_sequence()))
+            self.header = None
+        return records
+
+
+def scan_chunks(chunks):
+    """
+    Splits an iterable of byte blocks into raw FASTA records.
+
+    Args:
+        chunks: An iterable of bytes objects, e.g. fixed-size reads from a
+                binary file.
+
+    Yields:
+        A tuple of the header (bytes, without the leading '>' and surrounding
+        whitespace) and the sequence (bytes, with all whitespace removed).
+    """
+    cdef _Scanner scanner = _Scanner()
+    for chunk in chunks:
+        yield from scanner.feed(chunk)
+    yield from scanner.finish()
+
+
+cdef enum _LineState:
+    _LINE_START  # at the start of a line, possibly after indentation
+    _IN_HEADER
+    _IN_SEQUENCE
+
+
+@cython.final
+cdef class _HeaderScanner:
+    """Incremental header-only scanner fed one block at a time."""
+
+    cdef _LineState state
+    # Start of a header line that the previous block cut off.
+    cdef bytearray head
+
+    def __cinit__(self):
+        self.state = _LINE_START
+        self.head = bytearray()
+
+    cdef list feed(self, bytes chunk):
+        cdef const char *buf = PyBytes_AS_STRING(chunk)
+        cdef Py_ssize_t n = PyBytes_GET_SIZE(chunk)
+        cdef Py_ssize_t pos = 0, start = 0, end
+        cdef const char *nl
+        cdef list headers = []
+
+        while pos < n:
+            if self.state == _LINE_START:
+                while pos < n and _is_space(buf[pos]):
+                    pos += 1
+                if pos == n:
+                    break
+                if buf[pos] == b'>':
+                    self.state = _IN_HEADER
+                    pos += 1
+                    start = pos
+                else:
+                    self.state = _IN_SEQUENCE
+            # Both kinds of line end at the next newline; sequence bytes in
+            # between are only passed over by memchr().
+            nl = <const char *> memchr(buf + pos, b'\n', n - pos)
+            if nl == NULL:
+                if self.state == _IN_HEADER:
+                    self.head += chunk[start:]
+                break
+            end = nl - buf
+            if self.state == _IN_HEADER:
+                if self.head:
+                    self.head += chunk[start:end]
+                    headers.append(bytes(self.head).strip())
+                    self.head = bytearray()
+                else:
+                    while start < end and _is_space(buf[start]):
+                        start += 1
+                    while end > start and _is_space(buf[end - 1]):
+                        end -= 1
+                    headers.append(PyBytes_FromStringAndSize(buf + start, end - start))
+            self.state = _LINE_START
+            pos = (nl - buf) + 1
+        return headers
+
+    cdef list finish(self):
+        cdef list headers = []
+        if self.state == _IN_HEADER:
+            # The file ended on a header line.
+            headers.append(bytes(self.head).strip())
+        self.state = _LINE_START
+        self.head = bytearray()
+        return headers
+
+
+def scan_headers(chunks):
+    """
+    Finds the header lines in an iterable of byte blocks.
+
+    Args:
+        chunks: An iterable of bytes objects, e.g. fixed-size reads from a
+                binary file.
+
+    Yields:
+        A non-empty list per block of the headers that end in it (bytes,
+        without the leading '>' and surrounding whitespace).
+    """
+    cdef _HeaderScanner scanner = _HeaderScanner()
+    cdef list headers
+    for chunk in chunks:
+        headers = scanner.feed(chunk)
+        if headers:
+            yield headers
+    headers = scanner.finish()
+    if headers:
+        yield headers
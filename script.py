@@ -3,9 +3,12 @@ import sys
 import json
 import time
 import logging
-from typing import Dict, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Set, Tuple
 
+import orjson
 import requests
+from eth_utils import encode_hex, event_abi_to_log_topic
 from web3 import Web3
 from web3.exceptions import BlockNotFound
 from web3.contract import Contract
@@ -14,12 +17,51 @@ from dotenv import load_dotenv
 
 # --- Basic Configuration ---
 STATE_FILE = 'scanner_state.json'
+# Append-only log of processed source transaction hashes, stored as packed
+# raw 32-byte records rather than 66-character hex strings.
+PROCESSED_TX_LOG = 'scanner_state.processed.bin'
+TX_HASH_SIZE = 32
 LOG_FORMAT = '%(asctime)s - %(levelname)s - [%(module)s:%(lineno)d] - %(message)s'
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, stream=sys.stdout)
 logger = logging.getLogger(__name__)
 
+# --- Contract ABIs ---
+# In a real system, these would be loaded from files. They are parsed once at
+# import time rather than on every lookup.
+SOURCE_BRIDGE_ABI: List[Dict[str, Any]] = json.loads('''
+[
+    {
+        "anonymous": false,
+        "inputs": [
+            {"indexed": true, "internalType": "address", "name": "sender", "type": "address"},
+            {"indexed": false, "internalType": "address", "name": "recipient", "type": "address"},
+            {"indexed": false, "internalType": "uint256", "name": "amount", "type": "uint256"},
+            {"indexed": true, "internalType": "uint256", "name": "destinationChainId", "type": "uint256"}
+        ],
+        "name": "TokensLocked",
+        "type": "event"
+    }
+]
+''')
+
+DEST_BRIDGE_ABI: List[Dict[str, Any]] = json.loads('''
+[
+    {
+        "inputs": [
+            {"internalType": "address", "name": "recipient", "type": "address"},
+            {"internalType": "uint256", "name": "amount", "type": "uint256"},
+            {"internalType": "bytes32", "name": "sourceTxHash", "type": "bytes32"}
+        ],
+        "name": "mintTokens",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    }
+]
+''')
+
 
 class ConfigManager:
     """Manages configuration loading from environment variables."""
@@ -35,6 +77,8 @@ class ConfigManager:
         self.confirmations_required = int(os.getenv('BLOCK_CONFIRMATIONS_REQUIRED', '12'))
         self.scan_batch_size = int(os.getenv('SCAN_BATCH_SIZE', '100'))
         self.poll_interval_seconds = int(os.getenv('POLL_INTERVAL_SECONDS', '10'))
+        # Number of batches scanned concurrently while catching up on a large backlog.
+        self.scan_workers = int(os.getenv('SCAN_WORKERS', '8'))
 
         self.validate()
 
@@ -52,40 +96,11 @@ class ConfigManager:
 
     def get_source_bridge_abi(self) -> List[Dict[str, Any]]:
         """Provides a sample ABI for the source chain bridge contract."""
-        # In a real system, this would be loaded from a file.
-        return json.loads('''
-        [
-            {
-                "anonymous": false,
-                "inputs": [
-                    {"indexed": true, "internalType": "address", "name": "sender", "type": "address"},
-                    {"indexed": false, "internalType": "address", "name": "recipient", "type": "address"},
-                    {"indexed": false, "internalType": "uint256", "name": "amount", "type": "uint256"},
-                    {"indexed": true, "internalType": "uint256", "name": "destinationChainId", "type": "uint256"}
-                ],
-                "name": "TokensLocked",
-                "type": "event"
-            }
-        ]
-        ''')
+        return SOURCE_BRIDGE_ABI
 
     def get_dest_bridge_abi(self) -> List[Dict[str, Any]]:
         """Provides a sample ABI for the destination chain bridge contract."""
-        return json.loads('''
-        [
-            {
-                "inputs": [
-                    {"internalType": "address", "name": "recipient", "type": "address"},
-                    {"internalType": "uint256", "name": "amount", "type": "uint256"},
-                    {"internalType": "bytes32", "name": "sourceTxHash", "type": "bytes32"}
-                ],
-                "name": "mintTokens",
-                "outputs": [],
-                "stateMutability": "nonpayable",
-                "type": "function"
-            }
-        ]
-        ''')
+        return DEST_BRIDGE_ABI
 
 class BlockchainConnector:
     """Manages the connection to a blockchain via a Web3 provider."""
@@ -94,11 +109,18 @@ class BlockchainConnector:
         """Initializes the connector with a given RPC URL."""
         self.rpc_url = rpc_url
         self.web3: Optional[Web3] = None
+        # Keyed by address and ABI object; the ABI is kept with its contract
+        # so its id() cannot be reused by another list.
+        self._contracts: Dict[Tuple[str, int], Tuple[List[Dict[str, Any]], Contract]] = {}
+        # Set after an RPC connection error so the next get_web3() re-verifies the link.
+        self._stale = False
 
     def connect(self):
         """Establishes and tests the connection to the blockchain node."""
         try:
-            self.web3 = Web3(Web3.HTTPProvider(self.rpc_url, request_kwargs={'timeout': 60}))
+            # Reuse the existing instance on reconnect so cached contracts stay bound to it.
+            if self.web3 is None:
+                self.web3 = Web3(Web3.HTTPProvider(self.rpc_url, request_kwargs={'timeout': 60}))
             if self.web3.is_connected():
                 chain_id = self.web3.eth.chain_id
                 logger.info(f"Successfully connected to RPC endpoint: {self.rpc_url} (Chain ID: {chain_id})")
@@ -112,60 +134,116 @@ class BlockchainConnector:
             raise
 
     def get_web3(self) -> Web3:
-        """Returns the Web3 instance, ensuring a connection is established."""
-        if not self.web3 or not self.web3.is_connected():
+        """
+        Returns the Web3 instance, ensuring a connection is established.
+
+        The liveness probe (`is_connected()`, an RPC round-trip) only runs once
+        after `invalidate()`, keeping this call free in hot paths.
+        """
+        if not self.web3 or (self._stale and not self.web3.is_connected()):
             logger.warning("Web3 connection lost. Attempting to reconnect...")
             self.connect()
+        self._stale = False
         return self.web3
 
+    def invalidate(self):
+        """Marks the connection as suspect after an RPC connection error."""
+        self._stale = True
+
+    def get_contract(self, address: str, abi: List[Dict[str, Any]]) -> Contract:
+        """Returns the contract at `address` with `abi`, building it only on first use."""
+        web3 = self.get_web3()
+        checksum_address = web3.to_checksum_address(address)
+        key = (checksum_address, id(abi))
+        cached = self._contracts.get(key)
+        if cached is None:
+            cached = abi, web3.eth.contract(address=checksum_address, abi=abi)
+            self._contracts[key] = cached
+        return cached[1]
+
 class EventScanner:
     """Scans a blockchain for specific smart contract events."""
 
     def __init__(self, connector: BlockchainConnector, contract_address: str, abi: List[Dict[str, Any]], event_name: str):
         """Initializes the scanner with connection and contract details."""
+        self.connector = connector
         self.web3 = connector.get_web3()
-        self.contract_address = self.web3.to_checksum_address(contract_address)
-        self.contract: Contract = self.web3.eth.contract(address=self.contract_address, abi=abi)
-        self.event = getattr(self.contract.events, event_name)
+        self.contract: Contract = connector.get_contract(contract_address, abi)
+        self.contract_address = self.contract.address
+        # Instantiated so the event carries its resolved ABI for decoding raw logs.
+        self.event = getattr(self.contract.events, event_name)()
+        # topic0 (the hashed event signature) never changes, so compute it once.
+        self.event_topic = encode_hex(event_abi_to_log_topic(self.event.abi))
         self.event_name = event_name
         logger.info(f"EventScanner initialized for event '{event_name}' at {self.contract_address}")
 
-    def scan_blocks(self, from_block: int, to_block: int) -> List[LogReceipt]:
-        """Scans a range of blocks for the specified event and handles potential errors."""
+    def scan_blocks(self, from_block: int, to_block: int, skip: Optional[Set[bytes]] = None) -> Optional[List[LogReceipt]]:
+        """
+        Scans a range of blocks for the specified event and handles potential errors.
+
+        Logs whose raw transaction hash is in `skip` are dropped before their
+        arguments are ABI-decoded, which keeps rescans of processed ranges cheap.
+
+        Returns None if the range could not be scanned, so the caller can retry
+        it instead of skipping past its events.
+        """
         if from_block > to_block:
             return []
 
         logger.debug(f"Scanning for '{self.event_name}' events from block {from_block} to {to_block}")
         try:
-            event_filter = self.event.create_filter(fromBlock=from_block, toBlock=to_block)
-            events = event_filter.get_all_entries()
+            # No RPC call unless a previous scan hit a connection error.
+            self.connector.get_web3()
+            raw_logs = self.web3.eth.get_logs({
+                'address': self.contract_address,
+                'topics': [self.event_topic],
+                'fromBlock': from_block,
+                'toBlock': to_block,
+            })
+            if skip:
+                raw_logs = [log for log in raw_logs if log['transactionHash'] not in skip]
+            events = [self.event.process_log(log) for log in raw_logs]
             if events:
                 logger.info(f"Found {len(events)} '{self.event_name}' event(s) between blocks {from_block}-{to_block}")
             return events
         except BlockNotFound:
             logger.warning(f"Block range not found ({from_block}-{to_block}). The RPC node might be out of sync. Retrying later.")
-            return []
+            return None
         except requests.exceptions.Timeout:
             logger.error(f"RPC request timed out while scanning blocks {from_block}-{to_block}. Will retry in the next cycle.")
-            return []
+            return None
+        except requests.exceptions.ConnectionError as e:
+            logger.error(f"Connection error while scanning blocks {from_block}-{to_block}: {e}. Will reconnect in the next cycle.")
+            self.connector.invalidate()
+            return None
         except Exception as e:
             # This can catch a variety of issues, like oversized requests to the RPC.
             logger.error(f"Error scanning blocks {from_block}-{to_block}: {e}. Consider reducing SCAN_BATCH_SIZE.")
-            return []
+            return None
 
 class TransactionProcessor:
     """Handles the creation and (simulated) submission of transactions on the destination chain."""
 
     def __init__(self, connector: BlockchainConnector, contract_address: str, abi: List[Dict[str, Any]], private_key: str):
         """Initializes the processor with destination chain details."""
+        self.connector = connector
         self.web3 = connector.get_web3()
-        self.contract_address = self.web3.to_checksum_address(contract_address)
-        self.contract = self.web3.eth.contract(address=self.contract_address, abi=abi)
+        self.contract = connector.get_contract(contract_address, abi)
+        self.contract_address = self.contract.address
         self.account = self.web3.eth.account.from_key(private_key)
         logger.info(f"TransactionProcessor initialized for account {self.account.address}")
 
-    def process_lock_event(self, event: LogReceipt):
-        """Processes a 'TokensLocked' event by preparing a 'mintTokens' transaction."""
+    def process_lock_event(self, event: LogReceipt, cycle_context: Optional[Dict[str, Any]] = None):
+        """
+        Processes a 'TokensLocked' event by preparing a 'mintTokens' transaction.
+
+        `cycle_context` is shared by all events of one orchestrator cycle: the gas
+        price and account nonce are fetched from the node for the first event only,
+        and the nonce is then advanced locally for each prepared transaction. A
+        failed event makes the next one re-read the gas price but not the nonce.
+        """
+        if cycle_context is None:
+            cycle_context = {}
         args = event['args']
         source_tx_hash = event['transactionHash']
         recipient = args['recipient']
@@ -177,12 +255,18 @@ class TransactionProcessor:
         )
 
         try:
-            nonce = self.web3.eth.get_transaction_count(self.account.address)
+            # No RPC call unless a previous event hit a connection error.
+            self.connector.get_web3()
+            if 'gas_price' not in cycle_context:
+                cycle_context['gas_price'] = self.web3.eth.gas_price # In a real system, use a better gas strategy
+            if 'nonce' not in cycle_context:
+                cycle_context['nonce'] = self.web3.eth.get_transaction_count(self.account.address)
+            nonce = cycle_context['nonce']
             tx_params = {
                 'from': self.account.address,
                 'nonce': nonce,
                 'gas': 200000,  # A reasonable gas limit for a mint function
-                'gasPrice': self.web3.eth.gas_price, # In a real system, use a better gas strategy
+                'gasPrice': cycle_context['gas_price'],
             }
 
             # Build the transaction
@@ -206,9 +290,16 @@ class TransactionProcessor:
             logger.info(f"  - From: {mint_tx['from']}")
             logger.info(f"  - Nonce: {mint_tx['nonce']}")
             logger.info(f"  - Data: {mint_tx['data'][:50]}...")
+            cycle_context['nonce'] = nonce + 1
             return True
 
         except Exception as e:
+            # Re-read the gas price for the next event, but keep the local nonce:
+            # the node does not count the transactions prepared earlier in this
+            # cycle, so re-reading it would hand out one of their nonces again.
+            cycle_context.pop('gas_price', None)
+            if isinstance(e, requests.exceptions.ConnectionError):
+                self.connector.invalidate()
             logger.error(f"Failed to process event and create transaction for source hash {source_tx_hash.hex()}: {e}")
             return False
 
@@ -240,45 +331,169 @@ class BridgeOrchestrator:
             config.listener_private_key
         )
 
-        self.processed_transactions = set(self.state.get('processed_transactions', []))
+        # Long-lived so worker threads are reused across catch-up cycles. web3
+        # keeps one HTTP session per thread and endpoint, so each worker also
+        # keeps its own keep-alive connection to the RPC node.
+        self._scan_executor = ThreadPoolExecutor(
+            max_workers=max(config.scan_workers, 1),
+            thread_name_prefix='event-scanner',
+        )
+
+        # Hashes processed since the last save, not yet appended to the log.
+        self._unsaved_transactions: List[bytes] = []
+        # Set whenever the block number or processed hashes change; cleared once saved.
+        self._dirty = False
+        self.processed_transactions = self._load_processed_transactions()
 
     def _load_state(self) -> Dict[str, Any]:
         """Loads the last processed block number from a state file."""
         if os.path.exists(STATE_FILE):
             try:
-                with open(STATE_FILE, 'r') as f:
-                    state = json.load(f)
+                with open(STATE_FILE, 'rb') as f:
+                    state = orjson.loads(f.read())
                     logger.info(f"Loaded state from {STATE_FILE}: {state}")
                     return state
-            except (json.JSONDecodeError, IOError) as e:
+            except (orjson.JSONDecodeError, IOError) as e:
                 logger.warning(f"Could not read state file {STATE_FILE}, starting fresh. Error: {e}")
-        return {"last_processed_block": None, "processed_transactions": []}
+        return {"last_processed_block": None}
+
+    def _load_processed_transactions(self) -> Set[bytes]:
+        """Loads processed transaction hashes from the log and any legacy state entries."""
+        legacy = [
+            bytes.fromhex(tx_hash[2:] if tx_hash.startswith('0x') else tx_hash)
+            for tx_hash in self.state.pop('processed_transactions', [])
+        ]
+        data = b''
+        if os.path.exists(PROCESSED_TX_LOG):
+            try:
+                with open(PROCESSED_TX_LOG, 'rb') as f:
+                    data = f.read()
+            except IOError as e:
+                logger.warning(f"Could not read transaction log {PROCESSED_TX_LOG}. Error: {e}")
+
+        # A trailing partial record can only come from an interrupted append; drop it.
+        record_count = len(data) // TX_HASH_SIZE
+        processed = {
+            data[offset:offset + TX_HASH_SIZE]
+            for offset in range(0, record_count * TX_HASH_SIZE, TX_HASH_SIZE)
+        }
+        processed.update(legacy)
+        # Rewrite the log once if it holds redundant or partial records, or the
+        # state file still carries hashes from the old format.
+        if legacy or len(processed) != record_count or len(data) % TX_HASH_SIZE:
+            if not self._compact_processed_log(processed) and legacy:
+                # The hashes are gone from the state file once it is next
+                # saved, so append them to the log with that save instead.
+                self._unsaved_transactions.extend(legacy)
+                self._dirty = True
+        logger.info(f"Loaded {len(processed)} processed transaction(s) from {PROCESSED_TX_LOG}")
+        return processed
+
+    def _compact_processed_log(self, processed: Set[bytes]) -> bool:
+        """Rewrites the transaction log with exactly one record per processed hash; returns whether it succeeded."""
+        tmp_path = PROCESSED_TX_LOG + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(b''.join(sorted(processed)))
+            os.replace(tmp_path, PROCESSED_TX_LOG)
+            logger.info(f"Compacted {PROCESSED_TX_LOG} to {len(processed)} entries")
+            return True
+        except (IOError, OSError) as e:
+            logger.error(f"Could not compact transaction log {PROCESSED_TX_LOG}: {e}")
+            return False
+
+    def _set_last_processed_block(self, block_number: int):
+        """Updates the last processed block, marking the state dirty if it moved."""
+        if self.state.get('last_processed_block') != block_number:
+            self.state['last_processed_block'] = block_number
+            self._dirty = True
 
     def _save_state(self):
-        """Saves the last processed block number to the state file."""
+        """Saves the last processed block number and appends newly processed hashes to the log."""
+        if not self._dirty:
+            return
+
+        # Append the hashes first: if we crash before the block number is
+        # written, the rescanned events are recognised as already processed.
+        if self._unsaved_transactions:
+            try:
+                with open(PROCESSED_TX_LOG, 'ab') as f:
+                    # A failed append (e.g. ENOSPC) can leave a partial record;
+                    # drop it so this append starts on a record boundary.
+                    size = f.tell()
+                    if size % TX_HASH_SIZE:
+                        f.truncate(size - size % TX_HASH_SIZE)
+                    f.write(b''.join(self._unsaved_transactions))
+                self._unsaved_transactions.clear()
+            except IOError as e:
+                logger.error(f"Could not append to transaction log {PROCESSED_TX_LOG}: {e}")
+                return
+
+        # Write to a temporary file and rename it over the old one, so a crash
+        # mid-write never leaves a truncated state file behind.
+        tmp_path = STATE_FILE + '.tmp'
         try:
-            with open(STATE_FILE, 'w') as f:
+            with open(tmp_path, 'wb') as f:
                 state_data = {
                     "last_processed_block": self.state.get('last_processed_block'),
-                    "processed_transactions": list(self.processed_transactions)
                 }
-                json.dump(state_data, f, indent=4)
-                logger.debug(f"Saved state to {STATE_FILE}")
-        except IOError as e:
+                f.write(orjson.dumps(state_data, option=orjson.OPT_INDENT_2))
+            os.replace(tmp_path, STATE_FILE)
+            self._dirty = False
+            logger.debug(f"Saved state to {STATE_FILE}")
+        except (IOError, OSError) as e:
             logger.error(f"Could not write to state file {STATE_FILE}: {e}")
 
+    def _scan_parallel(self, from_block: int, to_block: int) -> Tuple[Optional[List[LogReceipt]], int]:
+        """
+        Scans a block range as concurrent batch-sized requests.
+
+        Returns the events in chain order together with the last block they
+        cover. That block is the end of the last batch in the unbroken run of
+        successful batches from `from_block`: events past a failed batch are
+        dropped, so the failed range is rescanned next cycle. The events are
+        None if the first batch failed.
+        """
+        batch_size = self.config.scan_batch_size
+        ranges = [
+            (start, min(start + batch_size - 1, to_block))
+            for start in range(from_block, to_block + 1, batch_size)
+        ]
+        futures = [
+            self._scan_executor.submit(self.event_scanner.scan_blocks, start, end, self.processed_transactions)
+            for start, end in ranges
+        ]
+
+        events: List[LogReceipt] = []
+        scanned_to = from_block - 1
+        for (start, end), future in zip(ranges, futures):
+            batch_events = future.result()
+            if batch_events is None:
+                logger.warning(f"Batch {start}-{end} failed; it and the batches after it will be rescanned next cycle")
+                break
+            events.extend(batch_events)
+            scanned_to = end
+
+        if scanned_to < from_block:
+            return None, scanned_to
+        events.sort(key=lambda event: (event['blockNumber'], event['logIndex']))
+        logger.info(f"Scanned blocks {from_block}-{scanned_to} in parallel batches")
+        return events, scanned_to
+
     def run(self):
         """The main execution loop for the orchestrator."""
         logger.info("Starting Bridge Orchestrator...")
-        w3_source = self.source_connector.get_web3()
 
         if self.state['last_processed_block'] is None:
             # If starting for the first time, begin from the current block to avoid processing history.
-            self.state['last_processed_block'] = w3_source.eth.block_number - self.config.confirmations_required
+            w3_source = self.source_connector.get_web3()
+            self._set_last_processed_block(w3_source.eth.block_number - self.config.confirmations_required)
             logger.info(f"No previous state found. Starting scan from block {self.state['last_processed_block']}")
 
         while True:
             try:
+                # No RPC call unless the last iteration hit a connection error.
+                w3_source = self.source_connector.get_web3()
                 latest_block = w3_source.eth.block_number
                 # The `to_block` is calculated to ensure we only process blocks that are confirmed.
                 to_block = latest_block - self.config.confirmations_required
@@ -289,32 +504,53 @@ class BridgeOrchestrator:
                     time.sleep(self.config.poll_interval_seconds)
                     continue
                 
-                # Ensure we don't query a massive range in one go
-                if to_block > from_block + self.config.scan_batch_size - 1:
-                    to_block = from_block + self.config.scan_batch_size - 1
-
-                events = self.event_scanner.scan_blocks(from_block, to_block)
+                batch_size = self.config.scan_batch_size
+                # Set when a parallel scan stops at a failed batch, so the
+                # failed range is retried after the poll interval, not at once.
+                scan_failed = False
+                if self.config.scan_workers > 1 and to_block - from_block + 1 > 10 * batch_size:
+                    # Far behind the head: fetch several batches concurrently.
+                    requested_to = min(to_block, from_block + self.config.scan_workers * batch_size - 1)
+                    events, to_block = self._scan_parallel(from_block, requested_to)
+                    scan_failed = to_block < requested_to
+                else:
+                    # Ensure we don't query a massive range in one go
+                    if to_block > from_block + batch_size - 1:
+                        to_block = from_block + batch_size - 1
+                    events = self.event_scanner.scan_blocks(from_block, to_block, self.processed_transactions)
+
+                if events is None:
+                    # The scan failed; keep the state where it is and retry the range.
+                    time.sleep(self.config.poll_interval_seconds)
+                    continue
 
+                # Gas price and nonce shared by the transactions prepared in this cycle.
+                cycle_context: Dict[str, Any] = {}
                 for event in events:
+                    tx_hash = bytes(event['transactionHash'])
                     tx_hash_hex = event['transactionHash'].hex()
-                    if tx_hash_hex in self.processed_transactions:
+                    if tx_hash in self.processed_transactions:
                         logger.warning(f"Skipping already processed transaction: {tx_hash_hex}")
                         continue
 
                     logger.info(f"New confirmed event detected in block {event['blockNumber']} (Tx: {tx_hash_hex})")
-                    success = self.tx_processor.process_lock_event(event)
+                    success = self.tx_processor.process_lock_event(event, cycle_context)
                     if success:
-                        self.processed_transactions.add(tx_hash_hex)
+                        self.processed_transactions.add(tx_hash)
+                        self._unsaved_transactions.append(tx_hash)
+                        self._dirty = True
 
-                self.state['last_processed_block'] = to_block
+                self._set_last_processed_block(to_block)
                 self._save_state()
                 
                 # If we processed a full batch, check again immediately.
                 # Otherwise, wait for the poll interval.
-                if to_block - from_block < self.config.scan_batch_size -1 :
+                if scan_failed or to_block - from_block < self.config.scan_batch_size -1 :
                      time.sleep(self.config.poll_interval_seconds)
 
             except Exception as e:
+                if isinstance(e, requests.exceptions.ConnectionError):
+                    self.source_connector.invalidate()
                 logger.error(f"An error occurred in the main loop: {e}", exc_info=True)
                 time.sleep(self.config.poll_interval_seconds * 2) # Longer sleep on error
 
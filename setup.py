@@ -0,0 +1,22 @@
+"""
+Builds the optional `fasta_c` extension used to speed up FASTA parsing.
+
+    python setup.py build_ext --inplace
+
+`fasta.py` falls back to its pure-Python scanner when the extension is not built.
+"""
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+extensions = [
+    Extension(
+        'fasta_c',
+        ['fasta_c.pyx'],
+        extra_compile_args=['-O3', '-march=native'],
+    ),
+]
+
+setup(
+    name='fasta_c',
+    ext_modules=cythonize(extensions, language_level=3),
+)
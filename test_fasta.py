@@ -0,0 +1,231 @@
+"""
+Differential tests for the FASTA scanners in `fasta.py`.
+
+Every available scanner (the `fasta_c` extension and the pure-Python block
+scanner) is run over the same inputs and compared with a line-by-line
+reference that has the semantics of the original text-mode parser. Scanners whose optional
+dependency is missing are skipped.
+
+    python -m unittest test_fasta
+"""
+import io
+import os
+import random
+import tempfile
+import unittest
+
+import fasta
+
+try:
+    import fasta_c
+except ImportError:
+    fasta_c = None
+
+CASES = {
+    'simple': '>a\nACGT\n>b\nGG\n',
+    'crlf': '>a desc\r\nACGT\r\nAC\r\n>b\r\nGG\r\n',
+    'blank lines': '\n\n>a\n\nAC\n\n\nGT\n\n>b\n\n',
+    'empty records': '>a\n>b\n\n>c\nA\n>d',
+    'header at eof': '>a\nAC\n>last header  ',
+    'no trailing newline': '>a\nAC\nGT',
+    'leading junk': 'junk\nmore junk\n>a\nAC\n',
+    'no records': 'just text\n',
+    'empty': '',
+    'whitespace in sequence': '>a\nAC GT\t\nA C\n>b\n  \t\n',
+    'gt inside a line': '>a\nAC>GT\n',
+    'indented first header': ' >a\nAC\n',
+    'indented header': '>a\nAC\n\t>b\nGG\n',
+    'indented headers with crlf': '\r\n \x0c>a\r\nAC\r\n\x0b >b \r\n  GG >c\r\n',
+    'header whitespace': '>  spaced out \t\n\tACGT  \n',
+    'vertical tab and form feed': '>\x0bCG\x0c\nA\x0bC\x0cG\n\x0c\n>b\x0c\r\nT\n',
+    'single-line records': '>a\nACGT\n>b x\nGG\n>c\n\n>d\nA>C\n>e \r\nTT\n>f\nA\n',
+    'long line': '>a\n' + 'ACGT' * 5000 + '\n>b\n' + 'T' * 70000,
+}
+
+
+def reference_records(text):
+    """Line-by-line parser matching the original `parse_fasta`, minus all sequence whitespace."""
+    records = []
+    header = None
+    parts = []
+    for line in io.StringIO(text, newline=None):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('>'):
+            if header is not None:
+                records.append((header, ''.join(parts)))
+            header = line[1:].strip()
+            parts = []
+        elif header is not None:
+            parts.append(''.join(line.split()))
+    if header is not None:
+        records.append((header, ''.join(parts)))
+    return records
+
+
+def random_case(rng):
+    """Builds a random FASTA text mixing LF/CRLF, blank lines and empty records."""
+    parts = []
+    if rng.random() < 0.2:
+        parts.append('junk line\n')
+    for _ in range(rng.randint(0, 6)):
+        header = rng.choice(['', 'id', ' sp  ', '\x0bid\x0c', 'x' * rng.randint(1, 30)])
+        indent = rng.choice(['', '', '', ' ', '\t ', '\x0c'])
+        parts.append(indent + '>' + header + rng.choice(['\n', '\r\n']))
+        for _ in range(rng.randint(0, 4)):
+            line = ''.join(rng.choice('ACGTACGT\x0b\x0c') for _ in range(rng.randint(0, 20)))
+            parts.append(line + rng.choice(['\n', '\r\n', '\n\n']))
+    text = ''.join(parts)
+    return text.rstrip('\n') if rng.random() < 0.3 else text
+
+
+def random_single_line_case(rng):
+    """Builds a random FASTA text of one-line records, now and then breaking the pattern."""
+    parts = []
+    for _ in range(rng.randint(1, 12)):
+        header = rng.choice(['id', ' id ', 'a>b', 'x' * rng.randint(1, 10)])
+        sequence = ''.join(rng.choice('ACGT') for _ in range(rng.randint(0, 12)))
+        parts.append('>' + header + '\n' + sequence + '\n')
+        if rng.random() < 0.1:
+            parts.append(rng.choice([' >indented\n', '\n', 'AC GT\n', '>no sequence\n', 'AC>GT\n', 'AC\r\n']))
+    return ''.join(parts)
+
+
+def all_cases():
+    rng = random.Random(1234)
+    cases = dict(CASES)
+    for index in range(200):
+        cases[f'random {index}'] = random_case(rng)
+    for index in range(100):
+        cases[f'random single-line {index}'] = random_single_line_case(rng)
+    return cases
+
+
+def split_points(data):
+    """Yields block splits of `data`: one per boundary for short inputs, plus fixed sizes."""
+    if len(data) <= 64:
+        for point in range(len(data) + 1):
+            yield [data[:point], data[point:]]
+    for size in (1, 2, 3, 7, 64):
+        yield [data[i:i + size] for i in range(0, len(data), size)]
+    yield [data]
+
+
+def as_text(records):
+    return [(bytes(header).decode(), bytes(sequence).decode()) for header, sequence in records]
+
+
+class ScannerTest(unittest.TestCase):
+    """Compares each raw record scanner with the reference parser."""
+
+    def check_chunk_scanner(self, scan):
+        for name, text in all_cases().items():
+            expected = reference_records(text)
+            data = text.encode()
+            for chunks in split_points(data):
+                with self.subTest(case=name, chunks=[len(c) for c in chunks][:8]):
+                    self.assertEqual(as_text(scan(chunks)), expected)
+
+    def test_block_scanner(self):
+        self.check_chunk_scanner(fasta._scan_chunks)
+
+    @unittest.skipIf(fasta_c is None, 'fasta_c extension not built')
+    def test_c_scanner(self):
+        self.check_chunk_scanner(fasta_c.scan_chunks)
+
+    def check_header_scanner(self, scan):
+        for name, text in all_cases().items():
+            expected = [header for header, _ in reference_records(text)]
+            for chunks in split_points(text.encode()):
+                with self.subTest(case=name, chunks=[len(c) for c in chunks][:8]):
+                    blocks = list(scan(chunks))
+                    self.assertTrue(all(blocks))
+                    self.assertEqual([header.decode() for block in blocks for header in block], expected)
+
+    def test_header_scanner(self):
+        self.check_header_scanner(fasta._scan_headers)
+
+    @unittest.skipIf(fasta_c is None, 'fasta_c extension not built')
+    def test_c_header_scanner(self):
+        self.check_header_scanner(fasta_c.scan_headers)
+
+
+
+class ParseFastaTest(unittest.TestCase):
+    """Exercises the public parsers over paths, binary streams and text streams."""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.fa')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def write(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def test_paths_and_streams_agree(self):
+        for name, text in CASES.items():
+            expected = reference_records(text)
+            self.write(text.encode())
+            with self.subTest(case=name):
+                self.assertEqual(list(fasta.parse_fasta(self.path, buffer_size=7)), expected)
+                with open(self.path, 'rb') as f:
+                    self.assertEqual(list(fasta.parse_fasta(f)), expected)
+                with open(self.path, newline='') as f:
+                    self.assertEqual(list(fasta.parse_fasta(f)), expected)
+                self.assertEqual(list(fasta.parse_fasta(io.StringIO(text))), expected)
+            with self.subTest(case=name, parser='headers'):
+                self.assertEqual(list(fasta.parse_fasta_headers(self.path)), [h for h, _ in expected])
+
+    def test_partially_read_text_stream(self):
+        # The text layer has already buffered the rest of the file after readline().
+        self.write(b'# comment\n>a\nAC\n>b\nGT\n')
+        with open(self.path) as f:
+            f.readline()
+            self.assertEqual(list(fasta.parse_fasta(f)), [('a', 'AC'), ('b', 'GT')])
+        with open(self.path) as f:
+            f.readline()
+            self.assertEqual([v.header for v in fasta.parse_fasta_views(f)], ['a', 'b'])
+        with open(self.path) as f:
+            f.readline()
+            self.assertEqual(list(fasta.parse_fasta_headers(f)), ['a', 'b'])
+
+    def test_text_stream_encoding(self):
+        self.write('>caf\xe9\nAC\n'.encode('latin-1'))
+        with open(self.path, encoding='latin-1') as f:
+            self.assertEqual(list(fasta.parse_fasta(f)), [('caf\xe9', 'AC')])
+        with open(self.path, encoding='latin-1') as f:
+            self.assertEqual(list(fasta.parse_fasta_headers(f)), ['caf\xe9'])
+
+    def test_headers_trim_ascii_whitespace_only(self):
+        text = '>a\xa0\x0b\nAC\n>\x0cb \xa0c\t\nGT\n'
+        expected = ['a\xa0', 'b \xa0c']
+        self.assertEqual([h for h, _ in fasta.parse_fasta(io.StringIO(text))], expected)
+        self.assertEqual(list(fasta.parse_fasta_headers(io.StringIO(text))), expected)
+        self.write(text.encode('utf-8'))
+        self.assertEqual(list(fasta.parse_fasta_headers(self.path)), expected)
+
+    def test_views_are_read_only(self):
+        self.write(b'>a\nACGT\n>b\nAC\nGT\n')
+        views = list(fasta.parse_fasta_views(self.path))
+        self.assertEqual([(v.header, bytes(v.sequence), len(v)) for v in views],
+                         [('a', b'ACGT', 4), ('b', b'ACGT', 4)])
+        for view in views:
+            self.assertTrue(view.sequence.readonly)
+
+    @unittest.skipIf(fasta.np is None, 'NumPy not installed')
+    def test_batches_match_records(self):
+        text = CASES['blank lines'] + CASES['empty records'] + '\n' + CASES['crlf']
+        expected = reference_records(text)
+        self.write(text.encode())
+        records = []
+        for headers, offsets, buffer in fasta.parse_fasta_batches(self.path, batch_size=2):
+            self.assertEqual(len(offsets), len(headers) + 1)
+            for i, header in enumerate(headers):
+                records.append((header, buffer[offsets[i]:offsets[i + 1]].decode()))
+        self.assertEqual(records, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+"""
+Tests for the bridge listener in `script.py` that run without an RPC node.
+
+    python -m unittest test_script
+"""
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+import orjson
+import requests
+from web3 import Web3
+
+import script
+
+ADDRESS = '0x' + '11' * 20
+
+
+def tx_hash(n):
+    return n.to_bytes(script.TX_HASH_SIZE, 'big')
+
+
+def make_orchestrator():
+    """Builds an orchestrator with the state loading of __init__ but no RPC connections."""
+    orchestrator = script.BridgeOrchestrator.__new__(script.BridgeOrchestrator)
+    orchestrator.state = orchestrator._load_state()
+    orchestrator._unsaved_transactions = []
+    orchestrator._dirty = False
+    orchestrator.processed_transactions = orchestrator._load_processed_transactions()
+    return orchestrator
+
+
+def chdir_to_temp(test):
+    """Runs `test` in a fresh temporary working directory, where the state files are written."""
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    cwd = os.getcwd()
+    os.chdir(directory.name)
+    test.addCleanup(os.chdir, cwd)
+
+
+class _Stop(BaseException):
+    """Ends BridgeOrchestrator.run(), which only stops on exceptions it does not catch."""
+
+
+class BlockchainConnectorTest(unittest.TestCase):
+    """Exercises the contract cache and the connection probe without an RPC node."""
+
+    def setUp(self):
+        self.connector = script.BlockchainConnector('http://localhost:8545')
+        self.connector.web3 = Web3()
+
+    def test_contracts_are_cached_per_abi(self):
+        source = self.connector.get_contract(ADDRESS, script.SOURCE_BRIDGE_ABI)
+        dest = self.connector.get_contract(ADDRESS.upper().replace('0X', '0x'), script.DEST_BRIDGE_ABI)
+        self.assertIsNot(source, dest)
+        self.assertTrue(hasattr(dest.functions, 'mintTokens'))
+        self.assertTrue(hasattr(source.events, 'TokensLocked'))
+        self.assertIs(self.connector.get_contract(ADDRESS, script.SOURCE_BRIDGE_ABI), source)
+        self.assertIs(self.connector.get_contract(ADDRESS, script.DEST_BRIDGE_ABI), dest)
+
+    def test_invalidate_probes_the_connection_once(self):
+        web3 = self.connector.web3 = mock.Mock()
+        self.connector.get_web3()
+        web3.is_connected.assert_not_called()
+        self.connector.invalidate()
+        self.assertIs(self.connector.get_web3(), web3)
+        self.assertIs(self.connector.get_web3(), web3)
+        web3.is_connected.assert_called_once_with()
+
+
+class TransactionProcessorTest(unittest.TestCase):
+    """Prepares mint transactions against a mocked destination chain."""
+
+    def setUp(self):
+        processor = script.TransactionProcessor.__new__(script.TransactionProcessor)
+        processor.connector = mock.Mock()
+        processor.web3 = mock.Mock()
+        processor.web3.eth.gas_price = 10
+        processor.web3.eth.get_transaction_count.return_value = 5
+        processor.account = mock.Mock(address=ADDRESS)
+        processor.contract = mock.Mock()
+        build = processor.contract.functions.mintTokens.return_value.build_transaction
+        build.side_effect = lambda params: dict(params, to=ADDRESS, data='0x')
+        self.processor = processor
+
+    def test_failed_event_keeps_the_local_nonce(self):
+        sign = self.processor.web3.eth.account.sign_transaction
+        sign.side_effect = [mock.DEFAULT, ValueError('signing failed'), mock.DEFAULT]
+        cycle_context = {}
+        events = [{'args': {'recipient': ADDRESS, 'amount': n}, 'transactionHash': tx_hash(n)} for n in range(3)]
+        results = [self.processor.process_lock_event(event, cycle_context) for event in events]
+
+        self.assertEqual(results, [True, False, True])
+        nonces = [call.args[0]['nonce'] for call in sign.call_args_list]
+        # Events 1 and 3 were prepared; the failed event 2 consumed no nonce.
+        self.assertEqual([nonces[0], nonces[2]], [5, 6])
+        self.processor.web3.eth.get_transaction_count.assert_called_once()
+
+
+class StatePersistenceTest(unittest.TestCase):
+    """Saves and reloads scanner state in a temporary working directory."""
+
+    def setUp(self):
+        chdir_to_temp(self)
+
+    def test_legacy_hashes_survive_failed_compaction(self):
+        legacy = [tx_hash(1), tx_hash(2)]
+        with open(script.STATE_FILE, 'wb') as f:
+            f.write(orjson.dumps({
+                'last_processed_block': 7,
+                'processed_transactions': ['0x' + h.hex() for h in legacy],
+            }))
+        with mock.patch.object(script.os, 'replace', side_effect=OSError('disk full')):
+            orchestrator = make_orchestrator()
+        self.assertEqual(orchestrator.processed_transactions, set(legacy))
+        orchestrator._set_last_processed_block(8)
+        orchestrator._save_state()
+
+        reloaded = make_orchestrator()
+        self.assertEqual(reloaded.processed_transactions, set(legacy))
+        self.assertEqual(reloaded.state, {'last_processed_block': 8})
+
+    def test_append_after_partial_record_keeps_alignment(self):
+        orchestrator = make_orchestrator()
+        with open(script.PROCESSED_TX_LOG, 'wb') as f:
+            # An earlier append that failed part-way through its second record.
+            f.write(tx_hash(1) + tx_hash(2)[:5])
+        orchestrator._unsaved_transactions = [tx_hash(2), tx_hash(3)]
+        orchestrator._dirty = True
+        orchestrator._save_state()
+
+        with open(script.PROCESSED_TX_LOG, 'rb') as f:
+            self.assertEqual(f.read(), tx_hash(1) + tx_hash(2) + tx_hash(3))
+        self.assertEqual(make_orchestrator().processed_transactions, {tx_hash(1), tx_hash(2), tx_hash(3)})
+
+
+class ParallelScanTest(unittest.TestCase):
+    """Drives the catch-up scan with a fake event scanner that fails chosen batches."""
+
+    def setUp(self):
+        chdir_to_temp(self)
+        self.failing = set()
+        self.calls = []
+        orchestrator = make_orchestrator()
+        orchestrator.config = SimpleNamespace(
+            confirmations_required=0, scan_batch_size=10, scan_workers=4, poll_interval_seconds=5)
+        orchestrator.event_scanner = mock.Mock(scan_blocks=self.scan_blocks)
+        orchestrator.tx_processor = mock.Mock()
+        orchestrator.source_connector = mock.Mock()
+        orchestrator._scan_executor = ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(orchestrator._scan_executor.shutdown)
+        self.orchestrator = orchestrator
+
+    def scan_blocks(self, from_block, to_block, skip=None):
+        self.calls.append((from_block, to_block))
+        if from_block in self.failing:
+            return None
+        # Two events per batch, in reverse chain order.
+        return [
+            {'blockNumber': block, 'logIndex': index, 'transactionHash': tx_hash(block)}
+            for index, block in enumerate((to_block, from_block))
+        ]
+
+    def run_once(self, latest_block):
+        """
+        Runs one loop iteration against a chain head of `latest_block`; returns the sleep mock.
+
+        An exception passed as `latest_block` is raised by the head lookup instead.
+        """
+        web3 = self.orchestrator.source_connector.get_web3.return_value
+        type(web3.eth).block_number = mock.PropertyMock(side_effect=[latest_block, _Stop()])
+        with mock.patch.object(script.time, 'sleep') as sleep:
+            with self.assertRaises(_Stop):
+                self.orchestrator.run()
+        return sleep
+
+    def test_ranges_cover_the_window_in_chain_order(self):
+        events, scanned_to = self.orchestrator._scan_parallel(1, 35)
+        self.assertEqual(sorted(self.calls), [(1, 10), (11, 20), (21, 30), (31, 35)])
+        self.assertEqual(scanned_to, 35)
+        self.assertEqual([e['blockNumber'] for e in events], [1, 10, 11, 20, 21, 30, 31, 35])
+
+    def test_events_past_a_failed_batch_are_dropped(self):
+        self.failing = {21}
+        events, scanned_to = self.orchestrator._scan_parallel(1, 40)
+        self.assertEqual(scanned_to, 20)
+        self.assertEqual([e['blockNumber'] for e in events], [1, 10, 11, 20])
+
+    def test_first_batch_failure_scans_nothing(self):
+        self.failing = {1}
+        self.assertEqual(self.orchestrator._scan_parallel(1, 40), (None, 0))
+
+    def test_full_window_scans_again_without_sleeping(self):
+        self.orchestrator.state['last_processed_block'] = 0
+        sleep = self.run_once(1000)
+        self.assertEqual(sorted(self.calls), [(1, 10), (11, 20), (21, 30), (31, 40)])
+        self.assertEqual(self.orchestrator.state['last_processed_block'], 40)
+        self.assertEqual(len(self.orchestrator.processed_transactions), 8)
+        sleep.assert_not_called()
+
+    def test_partial_failure_sleeps_before_retrying(self):
+        self.orchestrator.state['last_processed_block'] = 0
+        self.failing = {31}
+        sleep = self.run_once(1000)
+        self.assertEqual(self.orchestrator.state['last_processed_block'], 30)
+        sleep.assert_called_once_with(5)
+
+    def test_connection_error_in_main_loop_invalidates_the_connection(self):
+        self.orchestrator.state['last_processed_block'] = 0
+        sleep = self.run_once(requests.exceptions.ConnectionError('connection refused'))
+        self.orchestrator.source_connector.invalidate.assert_called_once_with()
+        self.assertEqual(self.orchestrator.source_connector.get_web3.call_count, 2)
+        self.assertEqual(self.calls, [])
+        sleep.assert_called_once_with(10)
+
+
+if __name__ == '__main__':
+    unittest.main()